@@ -0,0 +1,20 @@
+import math
+
+import numpy as np
+from numba import njit, prange
+
+
+@njit(parallel=True, fastmath=True, cache=True, nogil=True)
+def recompute_flows(pressure_drop, k, out):
+    """
+    Recompute flow rates (L/min) from pressure drops (kPa) as k * sqrt(dP).
+    """
+    for i in prange(pressure_drop.shape[0]):
+        out[i] = k * math.sqrt(pressure_drop[i])
+
+
+def warm_up():
+    """
+    Compile recompute_flows ahead of the first inhaler change.
+    """
+    recompute_flows(np.empty(0), 1.0, np.empty(0))
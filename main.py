@@ -1,11 +1,30 @@
 import serial
 import math
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-from matplotlib.animation import FuncAnimation
-from tkinter import Tk, Label, StringVar, IntVar, DoubleVar, Entry, Button, ttk
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from tkinter import Tk, Label, StringVar, IntVar, DoubleVar, Entry, Button, ttk, READABLE
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
 from datetime import datetime
+import logging
+import os
+import queue
+import select
+import struct
+import threading
 import time
+from typing import NamedTuple
+from flow_kernels import recompute_flows, warm_up as warm_up_flows
+from parse_sbp import N_FIELDS, parse_fields, warm_up as warm_up_parser
+
+try:
+    import termios
+except ImportError:
+    termios = None  # Not available on Windows
+
+log = logging.getLogger(__name__)
 
 # Inhaler names and resistances (Pa^0.5 x s x L^-1)
 INHALER_RESISTANCES = {
@@ -27,78 +46,347 @@ INHALER_RESISTANCES = {
     # "Spinhaler": 25.7
 }
 
+# Binary frame the Arduino can send instead of an ASCII line: a 2-byte header,
+# then the year as uint16, five uint8 date/time fields, five float32 values
+# (temperature, humidity, pressure, measurement time, pressure drop) and a
+# checksum byte (sum of the bytes between header and checksum, mod 256), little-endian.
+# On the Arduino side:
+#   struct __attribute__((packed)) Frame {
+#     uint8_t header[2] = {0xAA, 0x55};
+#     uint16_t year; uint8_t month, day, hour, minute, second;
+#     float temperature, humidity, pressure, meas_time, pressure_drop;
+#     uint8_t checksum;
+#   } frame;
+#   Serial.write((const uint8_t *)&frame, sizeof(frame));
+FRAME_HEADER = b"\xaa\x55"
+_FRAME = struct.Struct("<2sH5B5fB")
+_FRAME_FLOAT_FIELDS = ("temperature", "humidity", "pressure", "meas_time", "pressure_drop")
+
+# Number of most recent samples drawn on the plot
+PLOT_WINDOW = 2000
+
+# Minimum time between plot updates (ms); bursts of samples are drawn together
+UPDATE_INTERVAL_MS = 100
+
+class Sample(NamedTuple):
+    """
+    One parsed measurement from the inhaler. flow_rate is left as NaN by the
+    parsers and filled in by InhalerLogger._append with the current inhaler.
+    """
+    year: int
+    month: int
+    day: int
+    hour: int
+    minute: int
+    second: int
+    temperature: float
+    humidity: float
+    pressure: float
+    meas_time: float
+    pressure_drop: float
+    flow_rate: float = math.nan
+
+# CSV column names for the Sample fields
+_COL_MAP = {
+    "year": "Year",
+    "month": "Month",
+    "day": "Day",
+    "hour": "Hour",
+    "minute": "Minute",
+    "second": "Second",
+    "temperature": "Temperature (C)",
+    "humidity": "Humidity (%)",
+    "pressure": "Atmospheric Pressure (hPa)",
+    "meas_time": "Measurement Time (s)",
+    "pressure_drop": "Pressure Drop (kPa)",
+    "flow_rate": "Flow Rate (L/min)",
+}
+
+def _write_csv(columns, metadata, filename, float32_columns=()):
+    """
+    Write the sample columns and patient metadata to a CSV file (runs in a worker process).
+    float32_columns hold values decoded from float32 and are written as float32,
+    i.e. the shortest text that round-trips (23.4 rather than 23.399999618530273).
+    """
+    df = pd.DataFrame(columns)
+    df["Flow Rate (L/min)"] = df["Flow Rate (L/min)"].round(2)  # Full precision is kept in memory
+    for name in float32_columns:
+        df[name] = df[name].astype(np.float32)
+    for name, value in metadata.items():
+        df[name] = value
+    df.to_csv(filename, index=False)
+    return filename
+
 class InhalerLogger:
-    def __init__(self, port, baud_rate):
+    def __init__(self, port, baud_rate, binary=False):
         self.serial_port = port
         self.baud_rate = baud_rate
-        self.data = []
+        self.binary = binary  # Device sends binary frames instead of ASCII lines
         self.first_measurement = None
         self.inhaler_resistance = None
+        self._k = None  # Flow rate per sqrt(kPa) for the current resistance
         self.serial_connection = None
 
+        # Samples kept as one growable array per Sample field (capacity doubles when full)
+        self._cap = 1024
+        self._n = 0
+        self._cols = {name: np.empty(self._cap, dtype=Sample.__annotations__[name]) for name in Sample._fields}
+        self._times = self._cols["meas_time"]
+        self._flows = self._cols["flow_rate"]
+
+        # Scratch buffer for parse_fields (only used by the reader thread)
+        self._fields = np.empty(N_FIELDS)
+        warm_up_parser()
+        warm_up_flows()
+
+        # Samples parsed by the reader thread, drained on the GUI thread
+        self._q = queue.Queue()
+        self._rxbuf = bytearray()  # Received bytes not yet split into lines or frames
+        self._fd = None  # Raw tty fd when reads bypass pyserial (POSIX only)
+        self._cancel_r = None  # Pipe close() writes to, to wake a reader waiting on _fd
+        self._cancel_w = None
+
+        # Pipe the reader thread writes to after queueing samples, so the GUI can
+        # wait on it instead of polling (POSIX only)
+        self.wakeup_fd = None
+        self._wakeup_w = None
+        if os.name == "posix":
+            self.wakeup_fd, self._wakeup_w = os.pipe()
+            os.set_blocking(self._wakeup_w, False)
+        self._reader = threading.Thread(target=self._read_loop, daemon=True)
+
         # Retry connecting to the serial port
         for _ in range(5):  # Retry 5 times
             try:
                 self.serial_connection = serial.Serial(self.serial_port, self.baud_rate, timeout=1)
-                print(f"Connected to {self.serial_port} at {self.baud_rate} baud.")
+                log.info("Connected to %s at %s baud.", self.serial_port, self.baud_rate)
                 break
             except Exception as e:
-                print(f"Failed to connect to {self.serial_port}. Retrying... ({e})")
+                log.warning("Failed to connect to %s. Retrying... (%s)", self.serial_port, e)
                 time.sleep(2)
 
         if not self.serial_connection:
-            print("Failed to establish serial connection. Please check the port and try again.")
+            log.error("Failed to establish serial connection. Please check the port and try again.")
+        elif termios is not None:
+            self._use_raw_fd()
+
+    def _use_raw_fd(self):
+        """
+        Make reads on the tty fd block in the kernel until at least one byte arrives.
+        """
+        fd = self.serial_connection.fd
+        attrs = termios.tcgetattr(fd)
+        attrs[6][termios.VMIN] = 1
+        attrs[6][termios.VTIME] = 0
+        termios.tcsetattr(fd, termios.TCSANOW, attrs)
+        os.set_blocking(fd, True)  # pyserial opens the port with O_NONBLOCK
+        self._cancel_r, self._cancel_w = os.pipe()
+        self._fd = fd
+
+    def close(self):
+        """
+        Stop the reader thread, then close the serial connection.
+        """
+        connection = self.serial_connection
+        if not connection:
+            return
+
+        # Clear these first so the reader loop exits and never reads the fd again
+        self.serial_connection = None
+        self._fd = None
+        if self._cancel_w is not None:
+            os.write(self._cancel_w, b"\0")  # Wake a reader waiting in select
+        if self._reader.is_alive():
+            self._reader.join(timeout=2)  # pyserial reads return within the 1 s timeout
+
+        try:
+            connection.close()
+            log.info("Serial connection closed.")
+        except Exception as e:
+            log.error("Error closing serial connection: %s", e)
+
+    def start_reading(self):
+        """
+        Start the background serial reader. Set inhaler_resistance first.
+        """
+        if self.serial_connection:
+            self._reader.start()
+
+    def _read_chunk(self):
+        """
+        Read everything the port has buffered in one call into the receive buffer.
+        """
+        fd = self._fd
+        connection = self.serial_connection
+        if fd is not None:
+            # Wait for data, or for close() to cancel the read
+            ready, _, _ = select.select([fd, self._cancel_r], [], [])
+            if self._cancel_r in ready:
+                return
+            chunk = os.read(fd, 4096)
+            if not chunk:
+                raise serial.SerialException("device disconnected (read returned no data)")
+        elif connection:
+            # Block for at least one byte (up to the timeout), then take the rest
+            chunk = connection.read(connection.in_waiting or 1)
+        else:
+            return  # Closed
+        if chunk:
+            self._rxbuf += chunk
+
+    def _read_lines(self):
+        """
+        Read the next chunk and yield complete lines.
+        """
+        self._read_chunk()
+        while (i := self._rxbuf.find(b'\n')) >= 0:
+            line = bytes(self._rxbuf[:i])
+            del self._rxbuf[:i + 1]
+            yield line
+
+    def _read_frames(self):
+        """
+        Read the next chunk and yield complete binary frames, resyncing on FRAME_HEADER
+        and skipping candidates whose checksum does not match.
+        """
+        self._read_chunk()
+        while True:
+            start = self._rxbuf.find(FRAME_HEADER)
+            if start < 0:
+                del self._rxbuf[:-1]  # The last byte may be the start of a header
+                return
+            if len(self._rxbuf) - start < _FRAME.size:
+                del self._rxbuf[:start]  # Wait for the rest of the frame
+                return
+            frame = bytes(self._rxbuf[start:start + _FRAME.size])
+            if sum(frame[2:-1]) & 0xFF != frame[-1]:
+                del self._rxbuf[:start + 1]  # False header: search again after it
+                continue
+            del self._rxbuf[:start + _FRAME.size]
+            yield frame
+
+    def _read_samples(self):
+        """
+        Read the next chunk and yield the samples parsed from it.
+        """
+        if self.binary:
+            for frame in self._read_frames():
+                parsed_data = self.parse_frame(frame)
+                if parsed_data:
+                    yield parsed_data
+        else:
+            for raw_line in self._read_lines():
+                line = raw_line.strip()  # Kept as bytes; parse_line reads ASCII directly
+                if not line:
+                    continue
+                parsed_data = self.parse_data(line)
+                if parsed_data:
+                    yield parsed_data
+
+    def _read_loop(self):
+        """
+        Read and parse serial lines off the GUI thread, queueing the results.
+        """
+        while self.serial_connection:
+            try:
+                queued = False
+                for parsed_data in self._read_samples():
+                    if log.isEnabledFor(logging.DEBUG):
+                        log.debug("Parsed Data: %r", parsed_data)
+                    self._q.put(parsed_data)
+                    queued = True
+                if queued and self._wakeup_w is not None:
+                    try:
+                        os.write(self._wakeup_w, b"\0")
+                    except BlockingIOError:
+                        pass  # Pipe full: the GUI already has a wakeup pending
+            except (serial.SerialException, OSError) as e:
+                log.error("SerialException: %s", e)
+                self.serial_connection = None  # Mark the connection as invalid
+            except Exception as e:
+                log.error("Error reading serial data: %s", e)
+
+    def set_inhaler_resistance(self, resistance):
+        """
+        Set the inhaler resistance, precompute the flow rate constant and
+        recompute the flow rates of the samples recorded so far (GUI thread only).
+        """
+        if resistance != self.inhaler_resistance:
+            # sqrt(kPa * 1000) / R * 60 == k * sqrt(kPa)
+            self._k = 60.0 * math.sqrt(1000.0) / resistance
+            self.inhaler_resistance = resistance
+            n = self._n
+            recompute_flows(self._cols["pressure_drop"][:n], self._k, self._flows[:n])
 
     def calculate_flow_rate(self, pressure_drop_kpa):
         """
         Calculate the flow rate from the pressure drop using the inhaler resistance.
         """
-        pressure_drop_pa = pressure_drop_kpa * 1000  # Convert to Pa
-        sqrt_pressure_drop = math.sqrt(pressure_drop_pa)  # Square root
-        flow_rate = (sqrt_pressure_drop / self.inhaler_resistance) * 60  # Convert to L/min
-        return round(flow_rate, 2)
+        return self._k * math.sqrt(pressure_drop_kpa)  # L/min
+
+    def _append(self, sample):
+        """
+        Append one sample to the column arrays, growing them if needed.
+        """
+        if self._n == self._cap:
+            self._cap *= 2
+            for name, col in self._cols.items():
+                self._cols[name] = np.resize(col, self._cap)
+            self._times = self._cols["meas_time"]
+            self._flows = self._cols["flow_rate"]
+        for col, value in zip(self._cols.values(), sample):
+            col[self._n] = value
+        # Computed here, on the GUI thread like set_inhaler_resistance, so every
+        # recorded sample uses the currently selected inhaler
+        self._flows[self._n] = self.calculate_flow_rate(sample.pressure_drop)
+        self._n += 1
 
     def parse_data(self, line):
         """
         Parse the incoming serial data.
         """
         try:
-            parts = line.strip().split()
-            if len(parts) != 11:
-                print(f"Invalid data format: {line}")
+            values = parse_fields(line, self._fields)
+            if values is None:
+                log.warning("Invalid data format: %r", line)
                 return None
+            return self._make_sample(*values)
+        except Exception as e:
+            log.warning("Error parsing data: %r -> %s", line, e)
+            return None
 
-            # Extract data
-            year, month, day, hour, minute, second = map(int, parts[:6])
-            temp, humidity, pressure, meas_time, pressure_drop = map(float, parts[6:])
-
-            # Calculate flow rate
-            flow_rate = self.calculate_flow_rate(pressure_drop)
-
-            # Create a dictionary to store the parsed data
-            parsed_data = {
-                "Year": year,
-                "Month": month,
-                "Day": day,
-                "Hour": hour,
-                "Minute": minute,
-                "Second": second,
-                "Temperature (C)": temp,
-                "Humidity (%)": humidity,
-                "Atmospheric Pressure (hPa)": pressure,
-                "Measurement Time (s)": meas_time,
-                "Pressure Drop (kPa)": pressure_drop,
-                "Flow Rate (L/min)": flow_rate,
-            }
-
-            if not self.first_measurement:
-                self.first_measurement = parsed_data  # Save the first measurement
-
-            return parsed_data
+    def parse_frame(self, frame):
+        """
+        Parse one binary frame from the device.
+        """
+        try:
+            _, year, month, day, hour, minute, second, *floats, _ = _FRAME.unpack(frame)
+            if not (1 <= month <= 12 and 1 <= day <= 31 and hour < 24 and minute < 60 and second < 60):
+                log.warning("Invalid frame date/time: %r", frame)
+                return None
+            if not math.isfinite(floats[-1]):
+                log.warning("Invalid frame pressure drop: %r", frame)
+                return None
+            return self._make_sample(year, month, day, hour, minute, second, *floats)
         except Exception as e:
-            print(f"Error parsing data: {line} -> {e}")
+            log.warning("Error parsing frame: %r -> %s", frame, e)
             return None
 
+    def _make_sample(self, year, month, day, hour, minute, second,
+                     temp, humidity, pressure, meas_time, pressure_drop):
+        """
+        Build a Sample from the device fields (the flow rate is computed on append).
+        """
+        if not pressure_drop >= 0:  # Also rejects NaN
+            raise ValueError(f"invalid pressure drop {pressure_drop}")
+        parsed_data = Sample(year, month, day, hour, minute, second,
+                             temp, humidity, pressure, meas_time, pressure_drop)
+
+        if not self.first_measurement:
+            self.first_measurement = parsed_data  # Save the first measurement
+
+        return parsed_data
+
 class InhalerUI:
     def __init__(self, logger):
         self.logger = logger
@@ -125,16 +413,40 @@ class InhalerUI:
         self.humidity_var = StringVar(value="N/A")
         self.pressure_var = StringVar(value="N/A")
 
+        # Worker process for CSV export, so saving does not block the GUI
+        # (spawned, since forking a process that already runs threads can deadlock)
+        self._executor = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+
         # GUI Layout
         self.setup_ui()
 
-        # Plot Setup
-        self.fig, self.ax = plt.subplots(figsize=(8, 4))
+        # Plot Setup (embedded in the window; only the line is redrawn per update)
+        self.fig = Figure(figsize=(8, 4))
+        self.ax = self.fig.add_subplot()
         self.ax.set_title("Flow Rate (L/min) vs. Measurement Time (s)")
         self.ax.set_xlabel("Measurement Time (s)")
         self.ax.set_ylabel("Flow Rate (L/min)")
-        self.line, = self.ax.plot([], [], 'b-')
-        self.ani = FuncAnimation(self.fig, self.update_plot, interval=100, cache_frame_data=False)
+        self.ax.set_xlim(0, 10, auto=True)  # Initial limits; keep autoscaling on
+        self.ax.set_ylim(0, 100, auto=True)
+        self.line, = self.ax.plot([], [], 'b-', animated=True)
+        self.canvas = FigureCanvasTkAgg(self.fig, master=self.root)
+        self.canvas.get_tk_widget().grid(row=0, column=2, rowspan=10)
+        self._bg = None  # Axes background without the line, captured after each full draw
+        self.canvas.mpl_connect('draw_event', self._on_draw)
+        self._frame_i = 0
+
+        # Update the plot when the reader signals new samples; poll where Tk
+        # cannot watch file descriptors (Windows)
+        self._after_id = None  # Pending update_plot call, if any
+        self._last_update = 0.0  # time.monotonic() of the last update
+        if self.logger.wakeup_fd is not None:
+            self.root.tk.createfilehandler(self.logger.wakeup_fd, READABLE, self._on_wakeup)
+        else:
+            self._after_id = self.root.after(UPDATE_INTERVAL_MS, self._poll)
+
+        # The reader thread needs a resistance before it parses anything
+        self.logger.set_inhaler_resistance(INHALER_RESISTANCES[self.inhaler_var.get()])
+        self.logger.start_reading()
 
     def setup_ui(self):
         """
@@ -167,69 +479,156 @@ class InhalerUI:
 
         Label(self.root, text="Select Inhaler:").grid(row=8, column=0, sticky="w")
         ttk.Combobox(self.root, textvariable=self.inhaler_var, values=list(INHALER_RESISTANCES.keys())).grid(row=8, column=1, sticky="w")
+        self.inhaler_var.trace_add('write', self._on_inhaler_change)
 
         Button(self.root, text="Save Data", command=self.save_data).grid(row=9, column=0, pady=10)
         Button(self.root, text="Quit", command=self.quit_program).grid(row=9, column=1, pady=10)
 
-    def update_plot(self, i):
+    def _on_inhaler_change(self, *args):
         """
-        Update the plot dynamically with new data.
+        Update the logger's resistance when a different inhaler is selected.
         """
-        if self.running and self.logger.serial_connection:
-            try:
-                if self.logger.serial_connection.in_waiting > 0:
-                    line = self.logger.serial_connection.readline().decode('utf-8').strip()
-                    self.logger.inhaler_resistance = INHALER_RESISTANCES[self.inhaler_var.get()]
-                    parsed_data = self.logger.parse_data(line)
-                    if parsed_data:
-                        self.logger.data.append(parsed_data)
-            except serial.SerialException as e:
-                print(f"SerialException: {e}")
-                self.logger.serial_connection = None  # Mark the connection as invalid
-            except Exception as e:
-                print(f"Error reading serial data: {e}")
+        resistance = INHALER_RESISTANCES.get(self.inhaler_var.get())
+        if resistance is not None and resistance != self.logger.inhaler_resistance:  # Ignore partially typed names
+            self.logger.set_inhaler_resistance(resistance)
+
+            # Show the recomputed flow rates
+            self._set_line_data()
+            self.ax.relim()
+            self.ax.autoscale_view()
+            self.canvas.draw_idle()
+
+    def _set_line_data(self):
+        """
+        Point the line at the last PLOT_WINDOW samples (views into the logger arrays, no copies).
+        """
+        n = self.logger._n
+        start = max(0, n - PLOT_WINDOW)
+        self.line.set_data(self.logger._times[start:n], self.logger._flows[start:n])
+
+    def _on_draw(self, event):
+        """
+        Cache the freshly drawn axes background and draw the line on top of it.
+        """
+        self._bg = self.canvas.copy_from_bbox(self.ax.bbox)
+        self.ax.draw_artist(self.line)
 
-        # Prepare data for plotting
-        times = [entry["Measurement Time (s)"] for entry in self.logger.data]
-        flow_rates = [entry["Flow Rate (L/min)"] for entry in self.logger.data]
+    def _on_wakeup(self, fd, mask):
+        """
+        Clear the reader's wakeup signal and schedule one plot update, no sooner
+        than UPDATE_INTERVAL_MS after the last one.
+        """
+        os.read(fd, 4096)
+        if self._after_id is None:
+            elapsed_ms = (time.monotonic() - self._last_update) * 1000
+            delay = max(0, int(UPDATE_INTERVAL_MS - elapsed_ms))
+            self._after_id = self.root.after(delay, self._scheduled_update)
+
+    def _scheduled_update(self):
+        """
+        Run the update scheduled by _on_wakeup.
+        """
+        self._after_id = None
+        self._last_update = time.monotonic()
+        self.update_plot()
+
+    def _poll(self):
+        """
+        Update the plot every UPDATE_INTERVAL_MS (used when file handlers are unavailable).
+        """
+        self._after_id = self.root.after(UPDATE_INTERVAL_MS, self._poll)
+        self.update_plot()
 
-        self.line.set_data(times, flow_rates)
-        self.ax.relim()
-        self.ax.autoscale_view()
+    def update_plot(self):
+        """
+        Update the plot dynamically with new data.
+        """
+        if not self.running:
+            return
+
+        # Drain samples queued by the reader thread without blocking
+        any_new = False
+        while self.running:
+            try:
+                parsed_data = self.logger._q.get_nowait()
+            except queue.Empty:
+                break
+            self.logger._append(parsed_data)
+            any_new = True
+
+        # Nothing arrived: the line on screen is still current
+        if not any_new:
+            return
+
+        # One update for however many samples arrived
+        self._set_line_data()
+
+        # Rescale every 20 updates; a full redraw is only needed if the limits changed
+        self._frame_i += 1
+        if self._frame_i % 20 == 0:
+            limits = (self.ax.get_xlim(), self.ax.get_ylim())
+            self.ax.relim()
+            self.ax.autoscale_view()
+            if limits != (self.ax.get_xlim(), self.ax.get_ylim()):
+                self.canvas.draw_idle()  # _on_draw re-captures the background
+                return
+
+        # Blit only the line over the cached background
+        if self._bg is not None:
+            self.canvas.restore_region(self._bg)
+            self.ax.draw_artist(self.line)
+            self.canvas.blit(self.ax.bbox)
 
     def save_data(self):
         """
         Save the data to a CSV file.
         """
-        if self.logger.data:
-            df = pd.DataFrame(self.logger.data)
-            df["Measurement Location ID"] = self.location_id_var.get()
-            df["Patient ID"] = self.patient_id_var.get()
-            df["Sex"] = self.sex_var.get()
-            df["Birth Date"] = f"{self.birth_year_var.get()}-{self.birth_month_var.get():02d}-{self.birth_day_var.get():02d}"
-            df["Height (cm)"] = self.height_var.get()
-            df["Weight (kg)"] = self.weight_var.get()
-            filename = "inhaler_data.csv"
-            df.to_csv(filename, index=False)
-            print(f"Data saved to {filename}")
+        n = self.logger._n
+        if n:
+            # Copy so later samples or an inhaler change cannot alter what is saved
+            columns = {_COL_MAP[name]: col[:n].copy() for name, col in self.logger._cols.items()}
+            metadata = {
+                "Measurement Location ID": self.location_id_var.get(),
+                "Patient ID": self.patient_id_var.get(),
+                "Sex": self.sex_var.get(),
+                "Birth Date": f"{self.birth_year_var.get()}-{self.birth_month_var.get():02d}-{self.birth_day_var.get():02d}",
+                "Height (cm)": self.height_var.get(),
+                "Weight (kg)": self.weight_var.get(),
+            }
+            float32_columns = [_COL_MAP[name] for name in _FRAME_FLOAT_FIELDS] if self.logger.binary else []
+            future = self._executor.submit(_write_csv, columns, metadata, "inhaler_data.csv", float32_columns)
+            self.root.after(100, self._check_save, future)
         else:
-            print("No data to save.")
+            log.info("No data to save.")
+
+    def _check_save(self, future):
+        """
+        Report the result of a CSV export once the worker has finished.
+        """
+        if not future.done():
+            self.root.after(100, self._check_save, future)
+            return
+        try:
+            log.info("Data saved to %s", future.result())
+        except Exception as e:
+            log.error("Error saving data: %s", e)
 
     def quit_program(self):
         """
         Exit the program and close the serial connection.
         """
-        # Stop the animation loop
-        self.ani.event_source.stop()
+        # Stop the plot updates
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+        if self.logger.wakeup_fd is not None:
+            self.root.tk.deletefilehandler(self.logger.wakeup_fd)
         self.running = False
 
-        # Close the serial connection
-        if self.logger.serial_connection:
-            try:
-                self.logger.serial_connection.close()
-                print("Serial connection closed.")
-            except Exception as e:
-                print(f"Error closing serial connection: {e}")
+        # Stop the reader and close the serial connection
+        self.logger.close()
+
+        # Let a pending CSV export finish
+        self._executor.shutdown(wait=True)
 
         self.root.quit()
 
@@ -237,20 +636,20 @@ class InhalerUI:
         """
         Start the GUI and the plotting process.
         """
-        plt.show()
         self.root.mainloop()
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
     port = "COM7"  # Update with your actual COM port
     baud_rate = 9600
+    binary = False  # Set to True if the Arduino sends binary frames (see FRAME_HEADER)
 
-    logger = InhalerLogger(port, baud_rate)
+    logger = InhalerLogger(port, baud_rate, binary)
     ui = InhalerUI(logger)
 
     try:
         ui.start()
     except KeyboardInterrupt:
-        print("Exiting...")
+        log.info("Exiting...")
     finally:
-        if logger.serial_connection:
-            logger.serial_connection.close()
\ No newline at end of file
+        logger.close()
\ No newline at end of file
@@ -0,0 +1,95 @@
+import numpy as np
+from numba import njit
+
+# Fields per line: year, month, day, hour, minute, second,
+# temperature, humidity, pressure, measurement time, pressure drop
+N_FIELDS = 11
+N_INT_FIELDS = 6  # The leading date/time fields are integers
+
+# Longest digit string the fast path converts exactly: the digits fit in a
+# float64 integer and 10^decimals is exact, so one division rounds correctly
+_MAX_DIGITS = 15
+
+
+@njit(cache=True)
+def parse_line(buf, out, n_ints):
+    """
+    Parse a whitespace-separated line of numbers (as uint8 bytes) into out.
+
+    Accepts only plain decimals: an optional sign, then digits with at most
+    one '.', at most _MAX_DIGITS digits in total, and no '.' in the first
+    n_ints fields. Returns the number of fields parsed, or -1 if any token is
+    outside that format (exponents, nan/inf, long digit strings, garbage) or
+    there are more fields than out holds; parse_fields then falls back to
+    int()/float().
+    """
+    size = buf.shape[0]
+    n = 0
+    i = 0
+    while i < size:
+        c = buf[i]
+        if c == 32 or 9 <= c <= 13:  # Whitespace
+            i += 1
+            continue
+        if n == out.shape[0]:
+            return -1  # Too many fields
+
+        neg = False
+        if c == 45:  # '-'
+            neg = True
+            i += 1
+        elif c == 43:  # '+'
+            i += 1
+
+        # Accumulate all digits as an integer, then divide once by 10^decimals
+        mantissa = 0.0
+        divisor = 1.0
+        digits = 0
+        seen_dot = False
+        while i < size:
+            c = buf[i]
+            if 48 <= c <= 57:  # '0'-'9'
+                mantissa = mantissa * 10.0 + (c - 48)
+                if seen_dot:
+                    divisor *= 10.0
+                digits += 1
+            elif c == 46 and not seen_dot and n >= n_ints:  # '.'
+                seen_dot = True
+            elif c == 32 or 9 <= c <= 13:
+                break
+            else:
+                return -1
+            i += 1
+        if digits == 0 or digits > _MAX_DIGITS:
+            return -1
+
+        value = mantissa / divisor
+        out[n] = -value if neg else value
+        n += 1
+    return n
+
+
+def parse_fields(line, out):
+    """
+    Parse a line of N_FIELDS numbers (N_INT_FIELDS ints, then floats) into a list.
+
+    Uses parse_line, and int()/float() for lines it does not handle, so the
+    result matches the builtins. Returns None if the line does not have
+    N_FIELDS fields; raises ValueError if int()/float() reject a token.
+    """
+    if parse_line(np.frombuffer(line, dtype=np.uint8), out, N_INT_FIELDS) == N_FIELDS:
+        values = out.tolist()
+        values[:N_INT_FIELDS] = map(int, values[:N_INT_FIELDS])
+        return values
+
+    parts = line.split()
+    if len(parts) != N_FIELDS:
+        return None
+    return [int(p) for p in parts[:N_INT_FIELDS]] + [float(p) for p in parts[N_INT_FIELDS:]]
+
+
+def warm_up():
+    """
+    Compile parse_line ahead of the first real sample.
+    """
+    parse_line(np.frombuffer(b"0 1.5", dtype=np.uint8), np.empty(N_FIELDS), N_INT_FIELDS)
@@ -0,0 +1,60 @@
+import math
+import random
+
+import numpy as np
+import pytest
+
+pytest.importorskip("numba")
+
+from parse_sbp import N_FIELDS, N_INT_FIELDS, parse_fields
+
+
+def builtin_parse(line):
+    parts = line.split()
+    return [int(p) for p in parts[:N_INT_FIELDS]] + [float(p) for p in parts[N_INT_FIELDS:]]
+
+
+def parse(line):
+    return parse_fields(line, np.empty(N_FIELDS))
+
+
+def test_typical_line():
+    line = b"2024 12 2 14 30 15 23.45 40.1 950.25 0.1 -0.5"
+    assert parse(line) == builtin_parse(line)
+    assert all(type(v) is int for v in parse(line)[:N_INT_FIELDS])
+
+
+def test_decimal_in_int_field_is_rejected():
+    with pytest.raises(ValueError):
+        parse(b"2024.7 12 2 14 30 15 23.45 40.1 950.25 0.1 0.5")
+
+
+@pytest.mark.parametrize("token", [b"1e-3", b"2.5E2", b"nan", b"inf", b"-inf"])
+def test_tokens_outside_fast_path_match_float(token):
+    values = parse(b"2024 12 2 14 30 15 " + token + b" 40.1 950.25 0.1 0.5")
+    expected = float(token)
+    assert values[6] == expected or (math.isnan(expected) and math.isnan(values[6]))
+
+
+def test_long_digit_strings_match_float():
+    line = b"2024 12 2 14 30 15 0.1234567890123456789 40.1 950.25 123456789012345678 0.5"
+    assert parse(line) == builtin_parse(line)
+
+
+def test_random_decimals_match_float():
+    rng = random.Random(0)
+    for _ in range(10000):
+        floats = [f"{rng.uniform(-1e6, 1e6):.{rng.randint(0, 8)}f}" for _ in range(N_FIELDS - N_INT_FIELDS)]
+        line = ("2024 1 2 3 4 5 " + " ".join(floats)).encode()
+        assert parse(line) == builtin_parse(line)
+
+
+@pytest.mark.parametrize("line", [b"", b"1 2 3", b"2024 12 2 14 30 15 23.45 40.1 950.25 0.1 0.5 7"])
+def test_wrong_field_count(line):
+    assert parse(line) is None
+
+
+@pytest.mark.parametrize("token", [b"x", b"-", b".", b"1.2.3", b"1;"])
+def test_garbage_is_rejected(token):
+    with pytest.raises(ValueError):
+        parse(b"2024 12 2 14 30 15 " + token + b" 40.1 950.25 0.1 0.5")